@@ -1,42 +1,52 @@
 from __future__ import annotations
 
-from collections import deque
-from typing import Dict, List, Set, Tuple
+from typing import List, Tuple
 
-from snake_env import CLOCKWISE, SnakeEnv
+from snake_env import DXDY, NEXT_DIR, SnakeEnv, neighbor_table
 
-State = Tuple[int, ...]
-QTable = Dict[State, List[float]]
+State = int
+QTable = List[List[float]]
 Point = Tuple[int, int]
+Candidate = Tuple[int, int, int, bytearray, bool]
 
 
 class HybridSnakeAgent:
-    """RL + planning hybrid policy for stronger and safer gameplay."""
+    """RL + planning hybrid policy for stronger and safer gameplay.
 
-    def __init__(self, q_table: QTable):
+    The flood fill behind each move stops once the region holds the body plus
+    ``free_space_margin`` spare cells; beyond that extra room no longer
+    changes the score.
+    """
+
+    def __init__(self, q_table: QTable, free_space_margin: int = 32):
         self.q_table = q_table
+        self.free_space_margin = free_space_margin
+        # Scratch queue for _bfs_reach, sized to the board on first use.
+        self._bfs_queue: List[int] = []
 
     def choose_action(self, env: SnakeEnv, state: State) -> int:
-        safe_actions = self._safe_actions(env)
-        if not safe_actions:
+        candidates = self._safe_action_candidates(env)
+        if not candidates:
             return 0
 
-        q_values = self.q_table.get(state, [0.0, 0.0, 0.0])
+        q_values = self.q_table[state]
         base_dist = self._manhattan(env.snake[0], env.food)
 
-        best_action = safe_actions[0]
+        best_action = candidates[0][0]
         best_score = float("-inf")
 
-        for action in safe_actions:
-            next_head, next_body, ate_food = self._simulate_step(env, action)
-            blocked = set(next_body[1:])
+        food_idx = env.food_idx
+        neighbors = neighbor_table(env.width, env.height)
 
-            dist_to_food = self._shortest_path_dist(next_head, env.food, blocked, env.width, env.height)
-            free_space = self._flood_fill_size(next_head, blocked, env.width, env.height)
+        for action, next_idx, body_len, blocked, ate_food in candidates:
+            trap_threshold = body_len + 2
+            dist_to_food, free_space = self._bfs_reach(
+                next_idx, food_idx, blocked, neighbors, trap_threshold + self.free_space_margin
+            )
 
             # Trap check: if reachable area is too small, this move is risky.
             trap_penalty = 0.0
-            if free_space < len(next_body) + 2:
+            if free_space < trap_threshold:
                 trap_penalty = 6.0
 
             progress = 0.0
@@ -60,94 +70,105 @@ class HybridSnakeAgent:
         return best_action
 
     def choose_action_rl_only(self, state: State) -> int:
-        q_values = self.q_table.get(state, [0.0, 0.0, 0.0])
-        max_q = max(q_values)
-        for i, q in enumerate(q_values):
-            if q == max_q:
-                return i
-        return 0
-
-    def _safe_actions(self, env: SnakeEnv) -> List[int]:
-        actions: List[int] = []
-        for action in (0, 1, 2):
-            next_head, next_body, _ate = self._simulate_step(env, action)
-            if self._in_bounds(next_head, env.width, env.height) and next_head not in set(next_body[1:]):
-                actions.append(action)
-        return actions
-
-    def _simulate_step(self, env: SnakeEnv, action: int) -> Tuple[Point, List[Point], bool]:
-        idx = CLOCKWISE.index(env.direction)
-        if action == 0:
-            next_dir = CLOCKWISE[idx]
-        elif action == 1:
-            next_dir = CLOCKWISE[(idx + 1) % 4]
-        else:
-            next_dir = CLOCKWISE[(idx - 1) % 4]
-
-        hx, hy = env.snake[0]
-        next_head = (hx + next_dir.x, hy + next_dir.y)
-        ate_food = next_head == env.food
-
-        if ate_food:
-            next_body = [next_head] + list(env.snake)
-        else:
-            next_body = [next_head] + list(env.snake[:-1])
+        q_values = self.q_table[state]
+        return q_values.index(max(q_values))
 
-        return next_head, next_body, ate_food
+    def _safe_action_candidates(self, env: SnakeEnv) -> List[Candidate]:
+        """Simulate each relative action once and keep the ones that survive.
 
-    def _shortest_path_dist(
+        Each candidate is ``(action, next_idx, next_body_len, blocked, ate_food)``
+        where ``next_idx`` is the new head's flat cell index and ``blocked`` is
+        an occupancy buffer of the body after the move, minus the new head.
+        """
+        hx, hy = env.snake[0]
+        food = env.food
+        width = env.width
+        height = env.height
+        body_len = len(env.snake)
+
+        # Without food the tail moves away, so it no longer blocks. Both buffers
+        # are built lazily and shared across actions.
+        blocked_moving: bytearray | None = None
+        blocked_growing: bytearray | None = None
+
+        candidates: List[Candidate] = []
+        for action, next_dir in enumerate(NEXT_DIR[env.dir_idx]):
+            dx, dy = DXDY[next_dir]
+            nx = hx + dx
+            ny = hy + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            next_idx = ny * width + nx
+            ate_food = (nx, ny) == food
+            if ate_food:
+                if blocked_growing is None:
+                    blocked_growing = bytearray(env.occupancy)
+                blocked = blocked_growing
+            else:
+                if blocked_moving is None:
+                    blocked_moving = bytearray(env.occupancy)
+                    tail_x, tail_y = env.snake[-1]
+                    blocked_moving[tail_y * width + tail_x] = 0
+                blocked = blocked_moving
+            if blocked[next_idx]:
+                continue
+            candidates.append((action, next_idx, body_len + 1 if ate_food else body_len, blocked, ate_food))
+        return candidates
+
+    def _bfs_reach(
         self,
-        start: Point,
-        target: Point,
-        blocked: Set[Point],
-        width: int,
-        height: int,
-    ) -> int | None:
-        if start == target:
-            return 0
-        if target in blocked:
-            return None
-
-        q = deque([(start, 0)])
-        visited = {start}
-
-        while q:
-            (x, y), d = q.popleft()
-            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
-                np = (nx, ny)
-                if not self._in_bounds(np, width, height):
-                    continue
-                if np in blocked or np in visited:
+        start: int,
+        target: int,
+        blocked: bytearray,
+        neighbors: Tuple[Tuple[int, ...], ...],
+        limit: int,
+    ) -> Tuple[int | None, int]:
+        """Single BFS from ``start`` returning (distance to target, reachable cells).
+
+        Cells are flat indices and ``neighbors`` comes from ``neighbor_table``.
+        The distance is ``None`` when the target can't be reached. The cell
+        count is capped at ``limit``: the search stops as soon as that many
+        cells were seen and the target distance is settled.
+        """
+        if blocked[start]:
+            return None, 0
+
+        if len(self._bfs_queue) != len(blocked):
+            self._bfs_queue = [0] * len(blocked)
+        # ``queue`` is a flat FIFO read at ``head`` and written at ``tail``;
+        # every cell is enqueued at most once, so it never needs to wrap.
+        # Cells before ``level_end`` are ``depth`` steps from the start.
+        queue = self._bfs_queue
+        # Blocked and visited cells share one buffer: both are simply skipped.
+        seen = bytearray(blocked)
+
+        seen[start] = 1
+        queue[0] = start
+        head = 0
+        tail = 1
+        level_end = 1
+        depth = 0
+        dist: int | None = 0 if start == target else None
+        # A missing or blocked target is never found, so it can't hold up the exit.
+        settled = dist is not None or target < 0 or bool(blocked[target])
+
+        while head < tail and not (settled and tail >= limit):
+            if head == level_end:
+                level_end = tail
+                depth += 1
+            cell = queue[head]
+            head += 1
+            for nxt in neighbors[cell]:
+                if seen[nxt]:
                     continue
-                if np == target:
-                    return d + 1
-                visited.add(np)
-                q.append((np, d + 1))
-
-        return None
-
-    def _flood_fill_size(self, start: Point, blocked: Set[Point], width: int, height: int) -> int:
-        if start in blocked or not self._in_bounds(start, width, height):
-            return 0
-
-        q = deque([start])
-        visited = {start}
-
-        while q:
-            x, y = q.popleft()
-            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
-                np = (nx, ny)
-                if not self._in_bounds(np, width, height):
-                    continue
-                if np in blocked or np in visited:
-                    continue
-                visited.add(np)
-                q.append(np)
-
-        return len(visited)
-
-    def _in_bounds(self, p: Point, width: int, height: int) -> bool:
-        return 0 <= p[0] < width and 0 <= p[1] < height
+                seen[nxt] = 1
+                queue[tail] = nxt
+                tail += 1
+                if nxt == target:
+                    dist = depth + 1
+                    settled = True
+
+        return dist, min(tail, limit)
 
     def _manhattan(self, a: Point, b: Point) -> int:
         return abs(a[0] - b[0]) + abs(a[1] - b[1])
@@ -1,45 +1,48 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 from statistics import mean
-from typing import Dict, List, Tuple
+from typing import List
 
 from agent import HybridSnakeAgent
-from snake_env import SnakeEnv
-
-State = Tuple[int, ...]
-QTable = Dict[State, List[float]]
-
-
-def load_q_table(path: Path) -> QTable:
-    payload = json.loads(path.read_text(encoding="utf-8"))
-    q_table: QTable = {}
-    for key, value in payload.items():
-        state = tuple(int(x) for x in key.split("|"))
-        q_table[state] = [float(x) for x in value]
-    return q_table
+from snake_env import VectorSnakeEnv
+from train_q_learning import load_q_table
 
 
 def evaluate(args: argparse.Namespace) -> None:
-    q = load_q_table(Path(args.model))
-    env = SnakeEnv(width=args.width, height=args.height, seed=args.seed)
+    if args.episodes < 1:
+        raise SystemExit("--episodes must be at least 1")
+    model_path = Path(args.model)
+    if not model_path.exists():
+        raise SystemExit(f"model not found: {model_path}. train first.")
+    q = load_q_table(model_path)
+    num_envs = max(1, min(args.num_envs, args.episodes))
+    venv = VectorSnakeEnv(num_envs, width=args.width, height=args.height, seed=args.seed)
     agent = HybridSnakeAgent(q)
 
+    # Lane i plays episodes i, i + num_envs, ... so every lane gets a fixed quota
+    # and short episodes are not over-represented.
+    quotas = [len(range(i, args.episodes, num_envs)) for i in range(num_envs)]
     scores: List[int] = []
 
-    for _ in range(args.episodes):
-        state = env.reset()
-        done = False
-        info = {"score": 0}
-        while not done:
-            if args.policy == "rl":
-                action = agent.choose_action_rl_only(state)
-            else:
-                action = agent.choose_action(env, state)
-            state, _reward, done, info = env.step(action)
-        scores.append(info["score"])
+    states = venv.reset()
+    venv.active = [quota > 0 for quota in quotas]
+    while any(venv.active):
+        if args.policy == "rl":
+            actions = [agent.choose_action_rl_only(state) for state in states]
+        else:
+            actions = [
+                agent.choose_action(env, state) if active else 0
+                for env, state, active in zip(venv.envs, states, venv.active)
+            ]
+        states, _rewards, dones, infos = venv.step(actions)
+        for i, done in enumerate(dones):
+            if done:
+                scores.append(infos[i]["score"])
+                quotas[i] -= 1
+                if quotas[i] <= 0:
+                    venv.active[i] = False
 
     sorted_scores = sorted(scores)
     p50 = sorted_scores[len(scores) // 2]
@@ -62,6 +65,7 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--height", type=int, default=12)
     p.add_argument("--seed", type=int, default=123)
     p.add_argument("--policy", choices=["hybrid", "rl"], default="hybrid")
+    p.add_argument("--num-envs", type=int, default=1, help="boards played side by side")
     return p
 
 
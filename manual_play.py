@@ -3,7 +3,7 @@ from __future__ import annotations
 import argparse
 import tkinter as tk
 
-from snake_env import SnakeEnv, UP, DOWN, LEFT, RIGHT, CLOCKWISE
+from snake_env import SnakeEnv, UP, DOWN, LEFT, RIGHT, CLOCKWISE, NEXT_DIR
 
 
 class ManualSnakeApp:
@@ -29,13 +29,10 @@ class ManualSnakeApp:
         self.root.bind("r", self.restart)
 
     def _relative_action(self, target_dir) -> int:
-        idx = CLOCKWISE.index(self.env.direction)
-        if target_dir == CLOCKWISE[idx]:
-            return 0
-        if target_dir == CLOCKWISE[(idx + 1) % 4]:
-            return 1
-        if target_dir == CLOCKWISE[(idx - 1) % 4]:
-            return 2
+        target_idx = CLOCKWISE.index(target_dir)
+        for action, next_idx in enumerate(NEXT_DIR[self.env.dir_idx]):
+            if next_idx == target_idx:
+                return action
         return 0
 
     def _set_direction(self, target_dir):
@@ -1,25 +1,12 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 import tkinter as tk
-from typing import Dict, List, Tuple
 
 from agent import HybridSnakeAgent
 from snake_env import SnakeEnv
-
-State = Tuple[int, ...]
-QTable = Dict[State, List[float]]
-
-
-def load_q_table(path: Path) -> QTable:
-    payload = json.loads(path.read_text(encoding="utf-8"))
-    q_table: QTable = {}
-    for key, value in payload.items():
-        state = tuple(int(x) for x in key.split("|"))
-        q_table[state] = [float(x) for x in value]
-    return q_table
+from train_q_learning import QTable, load_q_table
 
 
 class SnakeApp:
@@ -44,6 +31,7 @@ class SnakeApp:
         h = env.height * cell + 70
         self.canvas = tk.Canvas(self.root, width=w, height=h, bg="#0b0f12", highlightthickness=0)
         self.canvas.pack()
+        self._build_scene()
 
         self.state = self.env.reset()
         self.running = True
@@ -78,8 +66,8 @@ class SnakeApp:
             return self.agent.choose_action_rl_only(self.state)
         return self.agent.choose_action(self.env, self.state)
 
-    def draw(self, reason: str = ""):
-        self.canvas.delete("all")
+    def _build_scene(self):
+        """Create every canvas item once; ``draw`` only moves and retexts them."""
         c = self.cell
         gw = self.env.width * c
         gh = self.env.height * c
@@ -92,31 +80,49 @@ class SnakeApp:
         for y in range(0, gh, c):
             self.canvas.create_line(0, y, gw, y, fill="#18222c")
 
-        fx, fy = self.env.food
-        self.canvas.create_oval(
-            fx * c + 5,
-            fy * c + 5,
-            (fx + 1) * c - 5,
-            (fy + 1) * c - 5,
-            fill="#ff6b57",
-            outline="#ffac9d",
-            width=2,
+        self._food_id = self.canvas.create_oval(
+            0, 0, 0, 0, fill="#ff6b57", outline="#ffac9d", width=2, state="hidden"
         )
 
-        for i, (x, y) in enumerate(self.env.snake):
+        # One rectangle per board cell, hidden until the snake grows into it.
+        self._segment_ids = []
+        for i in range(self.env.width * self.env.height):
             if i == 0:
                 fill, outline = "#5ff0bf", "#c8ffe9"
             else:
                 fill, outline = "#2bbf8f", "#71e8c3"
-            self.canvas.create_rectangle(
-                x * c + 3,
-                y * c + 3,
-                (x + 1) * c - 3,
-                (y + 1) * c - 3,
-                fill=fill,
-                outline=outline,
-                width=1,
+            self._segment_ids.append(
+                self.canvas.create_rectangle(0, 0, 0, 0, fill=fill, outline=outline, width=1, state="hidden")
             )
+        self._shown_segments = 0
+
+        self._hud1_id = self.canvas.create_text(
+            10, gh + 18, anchor="w", fill="#d7e3ee", font=("Menlo", 12, "bold")
+        )
+        self._hud2_id = self.canvas.create_text(10, gh + 44, anchor="w", fill="#9db3c7", font=("Menlo", 11))
+        self._status_id = self.canvas.create_text(
+            gw - 10, gh + 18, anchor="e", fill="#8cc3ff", font=("Menlo", 12, "bold")
+        )
+
+    def draw(self, reason: str = ""):
+        c = self.cell
+
+        fx, fy = self.env.food
+        if fx < 0:
+            self.canvas.itemconfigure(self._food_id, state="hidden")
+        else:
+            self.canvas.coords(self._food_id, fx * c + 5, fy * c + 5, (fx + 1) * c - 5, (fy + 1) * c - 5)
+            self.canvas.itemconfigure(self._food_id, state="normal")
+
+        shown = 0
+        for item, (x, y) in zip(self._segment_ids, self.env.snake):
+            self.canvas.coords(item, x * c + 3, y * c + 3, (x + 1) * c - 3, (y + 1) * c - 3)
+            if shown >= self._shown_segments:
+                self.canvas.itemconfigure(item, state="normal")
+            shown += 1
+        for item in self._segment_ids[shown : self._shown_segments]:
+            self.canvas.itemconfigure(item, state="hidden")
+        self._shown_segments = shown
 
         mode_label = "HYBRID" if self.policy_mode == "hybrid" else "RL"
         status = "RUN" if self.running else "PAUSE"
@@ -128,9 +134,9 @@ class SnakeApp:
         hud2 = "controls: Space pause | R restart | M mode | +/- speed"
         if reason:
             hud2 += f"   status: {reason}"
-        self.canvas.create_text(10, gh + 18, anchor="w", text=hud1, fill="#d7e3ee", font=("Menlo", 12, "bold"))
-        self.canvas.create_text(10, gh + 44, anchor="w", text=hud2, fill="#9db3c7", font=("Menlo", 11))
-        self.canvas.create_text(gw - 10, gh + 18, anchor="e", text=status, fill="#8cc3ff", font=("Menlo", 12, "bold"))
+        self.canvas.itemconfigure(self._hud1_id, text=hud1)
+        self.canvas.itemconfigure(self._hud2_id, text=hud2)
+        self.canvas.itemconfigure(self._status_id, text=status)
 
     def tick(self):
         reason = ""
@@ -13,6 +13,10 @@ State representation (11 binary features):
 10) food up
 11) food down
 
+``get_state`` packs the features into a single int (feature 1 is bit 0), so
+there are only ``NUM_STATES`` possible states and a Q-table can be a flat list
+indexed by state.
+
 Action representation: relative turn
 - 0: go straight
 - 1: turn right
@@ -21,24 +25,56 @@ Action representation: relative turn
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import deque
 import random
-from typing import List, Tuple
+from typing import Deque, List, Sequence, Tuple
 
 Point = Tuple[int, int]
 
+# A direction is a (dx, dy) step.
+Direction = Tuple[int, int]
+
+UP: Direction = (0, -1)
+RIGHT: Direction = (1, 0)
+DOWN: Direction = (0, 1)
+LEFT: Direction = (-1, 0)
+CLOCKWISE = (RIGHT, DOWN, LEFT, UP)
+
+# Hot-path lookup tables over direction indices into CLOCKWISE.
+# NEXT_DIR[dir_idx][action] -> new dir_idx; DXDY[dir_idx] -> (dx, dy).
+NEXT_DIR = ((0, 1, 3), (1, 2, 0), (2, 3, 1), (3, 0, 2))
+DXDY = CLOCKWISE
+# State bit set for each heading: right -> 4, down -> 6, left -> 3, up -> 5.
+DIR_STATE_BIT = (1 << 4, 1 << 6, 1 << 3, 1 << 5)
+
+_NEIGHBORS: dict[Tuple[int, int], Tuple[Tuple[int, ...], ...]] = {}
+
+
+def neighbor_table(width: int, height: int) -> Tuple[Tuple[int, ...], ...]:
+    """In-bounds 4-neighbours of every flat cell index ``y * width + x``.
 
-@dataclass(frozen=True)
-class Direction:
-    x: int
-    y: int
+    Off-board neighbours are left out rather than marked, so a search never
+    needs a bounds check. Tables are built once per board size.
+    """
+    table = _NEIGHBORS.get((width, height))
+    if table is None:
+        cells = []
+        for y in range(height):
+            for x in range(width):
+                cells.append(
+                    tuple(
+                        ny * width + nx
+                        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+                        if 0 <= nx < width and 0 <= ny < height
+                    )
+                )
+        table = tuple(cells)
+        _NEIGHBORS[(width, height)] = table
+    return table
 
 
-UP = Direction(0, -1)
-RIGHT = Direction(1, 0)
-DOWN = Direction(0, 1)
-LEFT = Direction(-1, 0)
-CLOCKWISE = [RIGHT, DOWN, LEFT, UP]
+STATE_BITS = 11
+NUM_STATES = 1 << STATE_BITS
 
 
 class SnakeEnv:
@@ -46,71 +82,80 @@ class SnakeEnv:
         self.width = width
         self.height = height
         self.rng = random.Random(seed)
-        self.snake: List[Point] = []
-        self.direction = RIGHT
+        self.snake: Deque[Point] = deque()
+        # One byte per cell, 1 where the snake's body is; indexed y * width + x.
+        self.occupancy = bytearray(width * height)
+        self.dir_idx = 0
         self.food: Point = (0, 0)
+        # Flat index of the food cell (y * width + x), -1 when the board is full.
+        self.food_idx = -1
         self.score = 0
         self.frame_count = 0
         self.max_frames_without_food = self.width * self.height * 2
         self.reset()
 
-    def reset(self) -> Tuple[int, ...]:
+    def reset(self) -> int:
         cx = self.width // 2
         cy = self.height // 2
-        self.direction = RIGHT
-        self.snake = [(cx, cy), (cx - 1, cy), (cx - 2, cy)]
+        self.dir_idx = 0
+        self.snake = deque([(cx, cy), (cx - 1, cy), (cx - 2, cy)])
+        self.occupancy = bytearray(self.width * self.height)
+        for x, y in self.snake:
+            self.occupancy[y * self.width + x] = 1
         self.score = 0
         self.frame_count = 0
         self._place_food()
         return self.get_state()
 
     def _place_food(self) -> None:
-        occupied = set(self.snake)
-        candidates = [
-            (x, y)
-            for x in range(self.width)
-            for y in range(self.height)
-            if (x, y) not in occupied
-        ]
-        if not candidates:
+        cells = self.width * self.height
+        free = cells - len(self.snake)
+        occupancy = self.occupancy
+        if free <= 0:
+            idx = -1
+        elif free * 2 >= cells:
+            # Mostly empty board: rejection sampling needs < 2 draws on average.
+            idx = self.rng.randrange(cells)
+            while occupancy[idx]:
+                idx = self.rng.randrange(cells)
+        else:
+            idx = self.rng.choice([i for i in range(cells) if not occupancy[i]])
+
+        self.food_idx = idx
+        if idx < 0:
             self.food = (-1, -1)
-            return
-        self.food = self.rng.choice(candidates)
+        else:
+            y, x = divmod(idx, self.width)
+            self.food = (x, y)
 
     def _is_collision(self, pt: Point) -> bool:
         x, y = pt
         if x < 0 or x >= self.width or y < 0 or y >= self.height:
             return True
-        if pt in self.snake[1:]:
-            return True
-        return False
-
-    def _next_direction(self, action: int) -> Direction:
-        idx = CLOCKWISE.index(self.direction)
-        if action == 0:
-            return CLOCKWISE[idx]
-        if action == 1:
-            return CLOCKWISE[(idx + 1) % 4]
-        if action == 2:
-            return CLOCKWISE[(idx - 1) % 4]
-        raise ValueError(f"invalid action: {action}")
-
-    def _next_head(self, direction: Direction) -> Point:
-        hx, hy = self.snake[0]
-        return (hx + direction.x, hy + direction.y)
+        # The head's own cell is never a candidate, so the whole body can be
+        # tested. The tail still blocks: collisions are checked before it moves.
+        return bool(self.occupancy[y * self.width + x])
 
-    def step(self, action: int) -> Tuple[Tuple[int, ...], float, bool, dict]:
+    @property
+    def direction(self) -> Direction:
+        return CLOCKWISE[self.dir_idx]
+
+    def step(self, action: int) -> Tuple[int, float, bool, dict]:
         prev_head = self.snake[0]
         prev_food_dist = abs(self.food[0] - prev_head[0]) + abs(self.food[1] - prev_head[1])
         self.frame_count += 1
-        self.direction = self._next_direction(action)
-        new_head = self._next_head(self.direction)
+        if action not in (0, 1, 2):
+            raise ValueError(f"invalid action: {action}")
+        self.dir_idx = NEXT_DIR[self.dir_idx][action]
+        dx, dy = DXDY[self.dir_idx]
+        new_head = (prev_head[0] + dx, prev_head[1] + dy)
 
         if self._is_collision(new_head):
             return self.get_state(), -12.0, True, {"score": self.score, "reason": "collision"}
 
         ate_food = new_head == self.food
-        self.snake.insert(0, new_head)
+        self.snake.appendleft(new_head)
+        self.occupancy[new_head[1] * self.width + new_head[0]] = 1
 
         reward = -0.03
         done = False
@@ -121,7 +166,8 @@ class SnakeEnv:
             self._place_food()
             self.frame_count = 0
         else:
-            self.snake.pop()
+            tail_x, tail_y = self.snake.pop()
+            self.occupancy[tail_y * self.width + tail_x] = 0
             new_food_dist = abs(self.food[0] - new_head[0]) + abs(self.food[1] - new_head[1])
             if new_food_dist < prev_food_dist:
                 reward += 0.2
@@ -140,36 +186,76 @@ class SnakeEnv:
 
         return self.get_state(), reward, done, {"score": self.score, "reason": "running"}
 
-    def get_state(self) -> Tuple[int, ...]:
-        head = self.snake[0]
-
-        dir_l = self.direction == LEFT
-        dir_r = self.direction == RIGHT
-        dir_u = self.direction == UP
-        dir_d = self.direction == DOWN
-
-        pt_straight = self._next_head(self.direction)
-        right_dir = self._next_direction(1)
-        left_dir = self._next_direction(2)
-        pt_right = self._next_head(right_dir)
-        pt_left = self._next_head(left_dir)
-
-        food_left = int(self.food[0] < head[0])
-        food_right = int(self.food[0] > head[0])
-        food_up = int(self.food[1] < head[1])
-        food_down = int(self.food[1] > head[1])
-
-        state = (
-            int(self._is_collision(pt_straight)),
-            int(self._is_collision(pt_right)),
-            int(self._is_collision(pt_left)),
-            int(dir_l),
-            int(dir_r),
-            int(dir_u),
-            int(dir_d),
-            food_left,
-            food_right,
-            food_up,
-            food_down,
-        )
+    def get_state(self) -> int:
+        hx, hy = self.snake[0]
+        width = self.width
+        height = self.height
+        occupancy = self.occupancy
+        dir_idx = self.dir_idx
+
+        # Bits 0-2: danger straight / right / left.
+        state = 0
+        for bit, next_idx in enumerate(NEXT_DIR[dir_idx]):
+            dx, dy = DXDY[next_idx]
+            x = hx + dx
+            y = hy + dy
+            if x < 0 or x >= width or y < 0 or y >= height or occupancy[y * width + x]:
+                state |= 1 << bit
+
+        # Bits 3-6: heading; bits 7-10: food left / right / up / down.
+        state |= DIR_STATE_BIT[dir_idx]
+        fx, fy = self.food
+        if fx < hx:
+            state |= 1 << 7
+        elif fx > hx:
+            state |= 1 << 8
+        if fy < hy:
+            state |= 1 << 9
+        elif fy > hy:
+            state |= 1 << 10
         return state
+
+
+class VectorSnakeEnv:
+    """``num_envs`` independent SnakeEnv lanes stepped together.
+
+    Lane ``i`` is seeded with ``seed + i``. A lane that finishes an episode is
+    reset in place and its ``info`` reports the final score. Lanes with
+    ``active[i]`` set to False are skipped (their action is ignored), which
+    lets callers retire lanes that have played enough episodes.
+    """
+
+    def __init__(self, num_envs: int, width: int = 12, height: int = 12, seed: int | None = None):
+        self.envs = [
+            SnakeEnv(width=width, height=height, seed=None if seed is None else seed + i)
+            for i in range(num_envs)
+        ]
+        self.states = [env.get_state() for env in self.envs]
+        self.active = [True] * num_envs
+
+    def __len__(self) -> int:
+        return len(self.envs)
+
+    def reset(self) -> List[int]:
+        self.states = [env.reset() for env in self.envs]
+        self.active = [True] * len(self.envs)
+        return list(self.states)
+
+    def step(self, actions: Sequence[int]) -> Tuple[List[int], List[float], List[bool], List[dict]]:
+        rewards: List[float] = []
+        dones: List[bool] = []
+        infos: List[dict] = []
+        for i, env in enumerate(self.envs):
+            if not self.active[i]:
+                rewards.append(0.0)
+                dones.append(False)
+                infos.append({})
+                continue
+            state, reward, done, info = env.step(actions[i])
+            if done:
+                state = env.reset()
+            self.states[i] = state
+            rewards.append(reward)
+            dones.append(done)
+            infos.append(info)
+        return list(self.states), rewards, dones, infos
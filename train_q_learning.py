@@ -1,88 +1,217 @@
 from __future__ import annotations
 
 import argparse
+from array import array
 import json
+import multiprocessing
 from pathlib import Path
 import random
 from statistics import mean
-from typing import Dict, List, Tuple
+from typing import List, Tuple
 
-from snake_env import SnakeEnv
+from snake_env import NUM_STATES, STATE_BITS, SnakeEnv
 
-State = Tuple[int, ...]
-QTable = Dict[State, List[float]]
+State = int
+QTable = List[List[float]]
 
+BINARY_SUFFIX = ".bin"
 
-def get_q(q_table: QTable, state: State) -> List[float]:
-    if state not in q_table:
-        q_table[state] = [0.0, 0.0, 0.0]
-    return q_table[state]
 
+def new_q_table() -> QTable:
+    return [[0.0, 0.0, 0.0] for _ in range(NUM_STATES)]
 
-def choose_action(q_table: QTable, state: State, epsilon: float, rng: random.Random) -> int:
-    if rng.random() < epsilon:
-        return rng.randint(0, 2)
-    q_values = get_q(q_table, state)
-    max_q = max(q_values)
-    best = [i for i, q in enumerate(q_values) if q == max_q]
-    return rng.choice(best)
 
+def visited_states(q_table: QTable) -> int:
+    return sum(1 for q_values in q_table if any(q_values))
 
-def update_q(
-    q_table: QTable,
-    state: State,
-    action: int,
-    reward: float,
-    next_state: State,
-    alpha: float,
-    gamma: float,
-) -> None:
-    q_values = get_q(q_table, state)
-    next_q_values = get_q(q_table, next_state)
-    target = reward + gamma * max(next_q_values)
-    q_values[action] += alpha * (target - q_values[action])
+
+def _legacy_state(key: str) -> State:
+    """Packed state for an old ``"f1|f2|...|f11"`` feature-list key."""
+    bits = key.replace("|", "")
+    if len(bits) != STATE_BITS:
+        raise ValueError(f"bad state key: {key!r}")
+    # Feature 1 is bit 0, so the digits are read back to front.
+    return int(bits[::-1], 2)
 
 
 def save_q_table(q_table: QTable, path: Path) -> None:
-    payload = {"|".join(map(str, k)): v for k, v in q_table.items()}
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    """Write the table as raw float64 rows (``.bin``) or compact JSON.
+
+    JSON keys are packed state ints and only states that were ever updated
+    are written; the rest stay at zero.
+    """
+    if path.suffix == BINARY_SUFFIX:
+        flat = array("d")
+        for q_values in q_table:
+            flat.extend(q_values)
+        path.write_bytes(flat.tobytes())
+        return
+    payload = {str(state): q_values for state, q_values in enumerate(q_table) if any(q_values)}
+    path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
 
 
 def load_q_table(path: Path) -> QTable:
+    """Read a table written by ``save_q_table``.
+
+    JSON files with the older ``"0|1|...|0"`` feature-list keys are accepted too.
+    """
     if not path.exists():
-        return {}
+        return new_q_table()
+    if path.suffix == BINARY_SUFFIX:
+        flat = array("d")
+        flat.frombytes(path.read_bytes())
+        if len(flat) != NUM_STATES * 3:
+            raise ValueError(f"{path}: expected {NUM_STATES * 3} values, got {len(flat)}")
+        return [flat[i : i + 3].tolist() for i in range(0, len(flat), 3)]
+
+    q_table = new_q_table()
     payload = json.loads(path.read_text(encoding="utf-8"))
-    result: QTable = {}
     for key, value in payload.items():
-        state = tuple(int(x) for x in key.split("|"))
-        result[state] = [float(x) for x in value]
-    return result
+        if "|" in key:
+            state = _legacy_state(key)
+        else:
+            state = int(key)
+        q_table[state] = [float(x) for x in value]
+    return q_table
+
+
+def run_episode(
+    env: SnakeEnv,
+    q_table: QTable,
+    epsilon: float,
+    alpha: float,
+    gamma: float,
+    rng: random.Random,
+    visits: List[int] | None = None,
+) -> int:
+    """Play one epsilon-greedy episode, updating ``q_table`` in place.
+
+    This is the training hot loop, so action selection and the TD update are
+    written inline and the per-step method lookups are hoisted into locals.
+    When ``visits`` is given, it counts the updates made to each state.
+    """
+    step = env.step
+    rand = rng.random
+    randint = rng.randint
+
+    state = env.reset()
+    done = False
+    info = {"score": 0}
+    while not done:
+        q_values = q_table[state]
+        if rand() < epsilon:
+            action = randint(0, 2)
+        else:
+            action = q_values.index(max(q_values))
+        next_state, reward, done, info = step(action)
+        target = reward + gamma * max(q_table[next_state])
+        q_values[action] += alpha * (target - q_values[action])
+        if visits is not None:
+            visits[state] += 1
+        state = next_state
+    return info["score"]
+
+
+def epsilon_at(args: argparse.Namespace, episode: int) -> float:
+    """Exploration rate used for ``episode`` (1-based) under linear decay."""
+    epsilon_decay = (args.epsilon_start - args.epsilon_end) / max(1, args.episodes)
+    return max(args.epsilon_end, args.epsilon_start - epsilon_decay * (episode - 1))
+
+
+def _train_chunk(
+    task: Tuple[QTable, int, int, argparse.Namespace],
+) -> Tuple[QTable, List[int], List[int]]:
+    """Worker entry point: train a private copy of the table on a range of episodes."""
+    q_table, start_episode, n_episodes, args = task
+    seed = args.seed + start_episode
+    rng = random.Random(seed)
+    env = SnakeEnv(width=args.width, height=args.height, seed=seed)
+    visits = [0] * NUM_STATES
+    scores = [
+        run_episode(env, q_table, epsilon_at(args, episode), args.alpha, args.gamma, rng, visits)
+        for episode in range(start_episode, start_episode + n_episodes)
+    ]
+    return q_table, visits, scores
+
+
+def merge_q_tables(base: QTable, results: List[Tuple[QTable, List[int]]]) -> QTable:
+    """Average worker tables per state, weighted by how often each worker updated it."""
+    merged = new_q_table()
+    for state in range(NUM_STATES):
+        total = sum(visits[state] for _q, visits in results)
+        if total == 0:
+            merged[state] = list(base[state])
+            continue
+        row = merged[state]
+        for q_table, visits in results:
+            weight = visits[state] / total
+            if weight:
+                for action in range(3):
+                    row[action] += weight * q_table[state][action]
+    return merged
+
+
+def train_parallel(args: argparse.Namespace, q_table: QTable) -> Tuple[QTable, List[int]]:
+    """Run episodes on ``args.workers`` processes, syncing the table every round.
+
+    Each round hands every worker the current table and ``args.sync_every``
+    episodes; the returned tables are merged with ``merge_q_tables``.
+    """
+    scores: List[int] = []
+    next_log = 1
+    with multiprocessing.Pool(args.workers) as pool:
+        episode = 1
+        while episode <= args.episodes:
+            tasks = []
+            for _worker in range(args.workers):
+                n_episodes = min(args.sync_every, args.episodes - episode + 1)
+                if n_episodes <= 0:
+                    break
+                tasks.append((q_table, episode, n_episodes, args))
+                episode += n_episodes
+
+            results = pool.map(_train_chunk, tasks)
+            q_table = merge_q_tables(q_table, [(q, visits) for q, visits, _scores in results])
+            for _q, _visits, chunk_scores in results:
+                scores.extend(chunk_scores)
+
+            if len(scores) >= next_log:
+                window = scores[-args.log_every :]
+                print(
+                    f"episode={len(scores):5d} epsilon={epsilon_at(args, len(scores)):.3f} "
+                    f"score={scores[-1]:2d} avg={mean(window):.2f} best={max(scores):2d} "
+                    f"states={visited_states(q_table)}"
+                )
+                next_log = (len(scores) // args.log_every + 1) * args.log_every
+
+    return q_table, scores
 
 
 def train(args: argparse.Namespace) -> None:
-    rng = random.Random(args.seed)
-    env = SnakeEnv(width=args.width, height=args.height, seed=args.seed)
+    if args.workers > 1 and args.sync_every < 1:
+        raise SystemExit("--sync-every must be at least 1")
     q_path = Path(args.output)
+    q_table = load_q_table(q_path) if args.resume else new_q_table()
 
-    q_table = load_q_table(q_path) if args.resume else {}
+    if args.workers > 1:
+        q_table, _scores = train_parallel(args, q_table)
+    else:
+        train_serial(args, q_table)
 
-    epsilon = args.epsilon_start
-    epsilon_decay = (args.epsilon_start - args.epsilon_end) / max(1, args.episodes)
+    q_path.parent.mkdir(parents=True, exist_ok=True)
+    save_q_table(q_table, q_path)
+    print(f"saved q-table: {q_path}")
 
-    scores: List[int] = []
 
-    for episode in range(1, args.episodes + 1):
-        state = env.reset()
-        done = False
+def train_serial(args: argparse.Namespace, q_table: QTable) -> List[int]:
+    rng = random.Random(args.seed)
+    env = SnakeEnv(width=args.width, height=args.height, seed=args.seed)
 
-        while not done:
-            action = choose_action(q_table, state, epsilon, rng)
-            next_state, reward, done, info = env.step(action)
-            update_q(q_table, state, action, reward, next_state, args.alpha, args.gamma)
-            state = next_state
+    scores: List[int] = []
 
-        scores.append(info["score"])
-        epsilon = max(args.epsilon_end, epsilon - epsilon_decay)
+    for episode in range(1, args.episodes + 1):
+        epsilon = epsilon_at(args, episode)
+        scores.append(run_episode(env, q_table, epsilon, args.alpha, args.gamma, rng))
 
         if episode % args.log_every == 0 or episode == 1:
             window = scores[-args.log_every :]
@@ -90,12 +219,10 @@ def train(args: argparse.Namespace) -> None:
             best = max(scores)
             print(
                 f"episode={episode:5d} epsilon={epsilon:.3f} "
-                f"score={scores[-1]:2d} avg={avg_score:.2f} best={best:2d} states={len(q_table)}"
+                f"score={scores[-1]:2d} avg={avg_score:.2f} best={best:2d} states={visited_states(q_table)}"
             )
 
-    q_path.parent.mkdir(parents=True, exist_ok=True)
-    save_q_table(q_table, q_path)
-    print(f"saved q-table: {q_path}")
+    return scores
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -110,6 +237,13 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--log-every", type=int, default=100)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--output", type=str, default="checkpoints/q_table.json")
+    parser.add_argument("--workers", type=int, default=1, help="train on this many processes")
+    parser.add_argument(
+        "--sync-every",
+        type=int,
+        default=500,
+        help="episodes each worker plays before tables are merged (with --workers > 1)",
+    )
     parser.add_argument("--resume", action="store_true", help="continue training from existing q-table")
     return parser
 